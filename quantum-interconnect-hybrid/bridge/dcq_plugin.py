@@ -12,8 +12,10 @@ from __future__ import annotations
 
 import argparse
 import logging
+import os
+import queue
 from concurrent import futures
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, Optional
 
 import grpc
 
@@ -23,12 +25,84 @@ import dcq_plugin_pb2_grpc as rpc  # type: ignore
 
 _LOG = logging.getLogger("dcq.plugin")
 
+# Plan parameters per telemetry tier (0 nominal, 1 degraded, 2 harsh):
+# mu_signal, mu_decoy, vac_prob, sig_prob, decoy_prob, rep-rate scale.
+# Harsher channels lower the signal mean photon number and shift weight to
+# vacuum/decoy states to stabilise QBER.
+_TIERS = (
+    (0.50, 0.08, 0.10, 0.75, 0.15, 1.0),
+    (0.40, 0.06, 0.15, 0.65, 0.20, 0.5),
+    (0.30, 0.05, 0.20, 0.60, 0.20, 0.125),
+)
+
+# Cross-domain hint per tier: preferred domain, DSCP, SRv6 BSID.  Nudge away
+# from FSO when the fog proxy (loss or QBER) indicates heavy degradation.
+_DOMAINS = (
+    (dcq.Domain.FSO, 46, "FC00::A"),
+    (dcq.Domain.FSO, 46, "FC00::A"),
+    (dcq.Domain.MMWAVE, 46, "FC00::A"),
+)
+
+# Human-readable plan summary, only rendered when the bridge asks for it.
+_format_rationale = "loss={:.1f}dB/km qber={:.2f}% -> rep={:.0f}MHz mu={:.2f} shift={:.0f}ps".format
+
+# Recycled PlanResponse messages.  Only PlanStream returns responses here:
+# the server serializes a yielded message before it resumes the generator,
+# so the previous response is free again once the next request arrives.
+_PLAN_POOL: "queue.LifoQueue[dcq.PlanResponse]" = queue.LifoQueue()
+
+# Accept the bridge's 10 s HTTP/2 keepalive pings.  PlanStream stays open but
+# carries no data while the bridge is halted on the QBER ceiling, and gRPC's
+# default server policy (one data-less ping per 5 minutes, GOAWAY after two
+# strikes) would tear that stream down during any fade longer than a minute.
+_SERVER_OPTIONS = (
+    ("grpc.http2.min_recv_ping_interval_without_data_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_ping_strikes", 0),
+)
+
+
+def _acquire_response() -> dcq.PlanResponse:
+    try:
+        return _PLAN_POOL.get_nowait()
+    except queue.Empty:
+        return dcq.PlanResponse()
+
 
 class Plugin(rpc.DualClockPluginServicer):
     """Simple planning heuristic for exercising the bridge."""
 
     def __init__(self) -> None:
         self._clock = dcq.ClockModel(coarse_ppb=0.0, fine_hz=0.0, tdc_bin_ps=10.0, gate_ns=1.0)
+        # Each telemetry tier maps onto one fixed decoy/domain profile, so the
+        # full responses are built once and PlanCycle only patches the
+        # per-cycle scalars.
+        decoys = (
+            dcq.DecoyProfile(
+                mu_signal=mu_signal,
+                mu_decoy=mu_decoy,
+                vac_prob=vac_prob,
+                sig_prob=sig_prob,
+                decoy_prob=dec_prob,
+            )
+            for mu_signal, mu_decoy, vac_prob, sig_prob, dec_prob, _ in _TIERS
+        )
+        domains = (
+            dcq.DomainPolicy(preferred=preferred, srv6_bsid=bsid, dscp=dscp, mlo_prefer_6ghz=True)
+            for preferred, dscp, bsid in _DOMAINS
+        )
+        self._templates = tuple(map(self._build_template, decoys, domains))
+
+    @staticmethod
+    def _build_template(decoys: dcq.DecoyProfile, domain: dcq.DomainPolicy) -> dcq.PlanResponse:
+        template = dcq.PlanResponse(
+            tx=dcq.TxOverrides(pulse_width_ps=100.0),
+            phase=dcq.PhaseOverrides(amzi_phase_deg=0.0, eom_bias_v_delta=0.0),
+            next_cycle_ms=500,
+        )
+        template.tx.decoys.CopyFrom(decoys)
+        template.domain.CopyFrom(domain)
+        return template
 
     # ------------------------------------------------------------------
     # Lifecycle RPCs
@@ -68,83 +142,45 @@ class Plugin(rpc.DualClockPluginServicer):
         rep_ceiling = limits.rep_rate_max_hz or 1.0e9
         rep_rate = max(rep_floor, min(1.0e8, rep_ceiling))
 
-        if telemetry.atm_loss_db_per_km > 10 or telemetry.qber_pct > 3:
-            rep_rate = max(rep_floor, rep_rate / 2.0)
-        if telemetry.atm_loss_db_per_km > 20 or telemetry.qber_pct > 5:
-            rep_rate = max(rep_floor, rep_rate / 4.0)
+        # The harsh thresholds imply the degraded ones, so the sum is the
+        # tier index (0 nominal, 1 degraded, 2 harsh).
+        loss = telemetry.atm_loss_db_per_km
+        qber = telemetry.qber_pct
+        tier = int(loss > 20 or qber > 5) + int(loss > 10 or qber > 3)
+        rep_rate = max(rep_floor, rep_rate * _TIERS[tier][5])
 
         # Convert fine frequency error to a gate shift.  Clamp so we do not
         # request excursions outside the bridge guard rails.
         gate_shift_ps = (self._clock.fine_hz / rep_rate) * 1e12
         gate_shift_ps = max(min(gate_shift_ps, 150.0), -150.0)
 
-        # Adaptive decoy profile mirroring the guidance from the review: lower
-        # signal mean photon number and increase vacuum/decoy probability in
-        # harsher channels to stabilise QBER.
-        mu_signal = 0.50
-        mu_decoy = 0.08
-        vac_prob = 0.10
-        sig_prob = 0.75
-        dec_prob = 0.15
-
-        if telemetry.atm_loss_db_per_km > 10 or telemetry.qber_pct > 3:
-            mu_signal = 0.40
-            mu_decoy = 0.06
-            vac_prob = 0.15
-            sig_prob = 0.65
-            dec_prob = 0.20
-        if telemetry.atm_loss_db_per_km > 20 or telemetry.qber_pct > 5:
-            mu_signal = 0.30
-            mu_decoy = 0.05
-            vac_prob = 0.20
-            sig_prob = 0.60
-            dec_prob = 0.20
-
         # Mild phase dither during scintillation events to keep interference
         # visibility from collapsing.
         phase_deg = 0.0
         if telemetry.scintillation_idx > 0.3:
             phase_deg = max(min((telemetry.scintillation_idx - 0.3) * 20.0, 8.0), -8.0)
 
-        # Cross-domain hint: nudge away from FSO when the fog proxy (loss or
-        # QBER) indicates significant degradation.
-        preferred = dcq.Domain.FSO
-        dscp = 46
-        bsid = "FC00::A"
-        if telemetry.atm_loss_db_per_km > 20 or telemetry.qber_pct > 5:
-            preferred = dcq.Domain.MMWAVE
-            dscp = 46
-            bsid = "FC00::A"
-
-        rationale = (
-            f"loss={telemetry.atm_loss_db_per_km:.1f}dB/km "
-            f"qber={telemetry.qber_pct:.2f}% -> rep={rep_rate/1e6:.0f}MHz "
-            f"mu={mu_signal:.2f} shift={gate_shift_ps:.0f}ps"
-        )
-
-        return dcq.PlanResponse(
-            tx=dcq.TxOverrides(
-                rep_rate_hz=rep_rate,
-                pulse_width_ps=100.0,
-                decoys=dcq.DecoyProfile(
-                    mu_signal=mu_signal,
-                    mu_decoy=mu_decoy,
-                    vac_prob=vac_prob,
-                    sig_prob=sig_prob,
-                    decoy_prob=dec_prob,
-                ),
-                gate_shift_ps=gate_shift_ps,
-            ),
-            phase=dcq.PhaseOverrides(amzi_phase_deg=phase_deg, eom_bias_v_delta=0.0),
-            domain=dcq.DomainPolicy(
-                preferred=preferred,
-                srv6_bsid=bsid,
-                dscp=dscp,
-                mlo_prefer_6ghz=True,
-            ),
-            next_cycle_ms=500,
-            rationale=rationale,
-        )
+        # The template carries the tier's decoy profile and domain hint.
+        # CopyFrom clears whatever a recycled response still carried.
+        resp = _acquire_response()
+        resp.CopyFrom(self._templates[tier])
+        resp.tx.rep_rate_hz = rep_rate
+        resp.tx.gate_shift_ps = gate_shift_ps
+        resp.phase.amzi_phase_deg = phase_deg
+
+        if request.include_rationale:
+            resp.rationale = _format_rationale(
+                loss, qber, rep_rate / 1e6, resp.tx.decoys.mu_signal, gate_shift_ps
+            )
+        return resp
+
+    def PlanStream(
+        self, request_iterator: Iterable[dcq.PlanRequest], context: grpc.ServicerContext
+    ) -> Iterator[dcq.PlanResponse]:  # type: ignore[override]
+        for request in request_iterator:
+            resp = self.PlanCycle(request, context)
+            yield resp
+            _PLAN_POOL.put(resp)
 
     def Events(self, request_iterator: Iterable[dcq.Telemetry], context: grpc.ServicerContext) -> dcq.Ack:  # type: ignore[override]
         for telemetry in request_iterator:
@@ -156,7 +192,13 @@ def serve(listen: str) -> None:
     """Start the sample plugin server."""
 
     _LOG.info("starting sample plugin on %s", listen)
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    # Streaming RPCs (PlanStream, Events) pin a worker each for their whole
+    # lifetime, so size the pool well above the number of concurrent streams.
+    executor = futures.ThreadPoolExecutor(
+        max_workers=max(8, (os.cpu_count() or 2) * 2),
+        thread_name_prefix="dcq-plugin",
+    )
+    server = grpc.server(executor, options=_SERVER_OPTIONS)
     rpc.add_DualClockPluginServicer_to_server(Plugin(), server)
     server.add_insecure_port(listen)
     server.start()
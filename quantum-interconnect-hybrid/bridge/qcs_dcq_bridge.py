@@ -10,10 +10,11 @@ from __future__ import annotations
 
 import argparse
 import logging
+import queue
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
 import sys
 
@@ -63,6 +64,12 @@ try:  # pragma: no cover - import guard
 except ModuleNotFoundError as exc:  # pragma: no cover - import guard
     _handle_missing_dependency(exc)
 
+try:  # pragma: no cover - depends on PyYAML build
+    # libyaml-backed loader; the pure-Python SafeLoader is far slower.
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on PyYAML build
+    from yaml import SafeLoader as _YamlLoader
+
 # --- import generated stubs (adjust PYTHONPATH for your environment) ---
 try:  # pragma: no cover - import guard
     import qcs_control_pb2 as qcs  # type: ignore
@@ -79,21 +86,88 @@ except ModuleNotFoundError as exc:  # pragma: no cover - import guard
 
 _LOG = logging.getLogger("dcq.bridge")
 
+# Keep both channels warm between sparse plan/telemetry frames so reconnects
+# do not pay TCP slow-start, and let HTTP/2 pings flow while streams idle.
+_CHANNEL_OPTIONS = (
+    ("grpc.keepalive_time_ms", 10000),
+    ("grpc.keepalive_timeout_ms", 5000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.http2.min_time_between_pings_ms", 10000),
+)
+
+# Status fields beyond the published qchs.v1 StatusResponse.  Resolve once
+# which of them the controller schema on PYTHONPATH actually declares, so
+# the per-cycle conversion needs no hasattr/getattr probing.
+_STATUS_FIELDS = qcs.StatusResponse.DESCRIPTOR.fields_by_name
+_OPTIONAL_STATUS_FIELDS = tuple(
+    (src, dst)
+    for src, dst in (
+        ("dark_counts_cps", "dark_cps"),
+        ("det_efficiency", "det_eff"),
+        ("temperature_c", "temperature_c"),
+        ("scintillation_idx", "scintillation_idx"),
+    )
+    if src in _STATUS_FIELDS
+)
+_STATUS_HAS_SITE = "site" in _STATUS_FIELDS
+
+_DOMAIN_LABELS = {
+    dcq.Domain.FSO: "FSO",
+    dcq.Domain.MMWAVE: "mmWave",
+    dcq.Domain.LEO: "LEO",
+    dcq.Domain.WIFI7: "Wi-Fi 7",
+    dcq.Domain.FR3_6G: "FR3/6G",
+}
+# qchs.v1 DomainPolicy.preferred strings for the domains this build knows.
+# Domain is an open enum, so plugins built against a newer dcq.v1 may send
+# values outside this table.
+_DOMAIN_NAMES = {value: dcq.Domain.Name(value) for value in _DOMAIN_LABELS}
 
-def clamp(value: float, bounds: Tuple[float, float]) -> float:
-    """Clamp *value* to the inclusive *bounds* tuple."""
+
+def _check_bounds(bounds: Tuple[float, float]) -> Tuple[float, float]:
+    """Return *bounds* as ``(lo, hi)`` floats, rejecting inverted or NaN ranges."""
     lo, hi = bounds
-    if lo > hi:
+    # Any comparison with NaN is False, so one test covers both cases.
+    if not lo <= hi:
         raise ValueError(f"invalid clamp bounds: {bounds}")
+    return float(lo), float(hi)
+
+
+def clamp(value: float, bounds: Tuple[float, float]) -> float:
+    """Clamp *value* to the inclusive *bounds* tuple.
+
+    Kept as a public helper; the bridge itself inlines its clamps against
+    bounds cached on :class:`BridgeRuntime`.
+    """
+    lo, hi = _check_bounds(bounds)
     return max(lo, min(hi, value))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TLSConfig:
     enable: bool = False
     ca: Optional[Path] = None
     cert: Optional[Path] = None
     key: Optional[Path] = None
+    # Key material is read once when the config is built so reconnects never
+    # touch the filesystem; the credentials object is shared across channels.
+    # The instance is frozen, so these caches are set via object.__setattr__.
+    _ca_bytes: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _cert_bytes: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _key_bytes: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _credentials: Optional[grpc.ChannelCredentials] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if not self.enable:
+            return
+        if not (self.ca and self.ca.exists()):
+            raise FileNotFoundError(f"TLS CA file missing: {self.ca}")
+        object.__setattr__(self, "_ca_bytes", self.ca.read_bytes())
+        object.__setattr__(self, "_key_bytes", self.key.read_bytes() if self.key else None)
+        object.__setattr__(self, "_cert_bytes", self.cert.read_bytes() if self.cert else None)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "TLSConfig":
@@ -107,19 +181,17 @@ class TLSConfig:
     def credentials(self) -> Optional[grpc.ChannelCredentials]:
         if not self.enable:
             return None
-        if not (self.ca and self.ca.exists()):
-            raise FileNotFoundError(f"TLS CA file missing: {self.ca}")
-        root_certificates = self.ca.read_bytes()
-        private_key = self.key.read_bytes() if self.key else None
-        certificate_chain = self.cert.read_bytes() if self.cert else None
-        return grpc.ssl_channel_credentials(
-            root_certificates=root_certificates,
-            private_key=private_key,
-            certificate_chain=certificate_chain,
-        )
+        if self._credentials is None:
+            credentials = grpc.ssl_channel_credentials(
+                root_certificates=self._ca_bytes,
+                private_key=self._key_bytes,
+                certificate_chain=self._cert_bytes,
+            )
+            object.__setattr__(self, "_credentials", credentials)
+        return self._credentials
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SafetyLimits:
     mu_range: Tuple[float, float]
     rep_rate_hz_range: Tuple[float, float]
@@ -146,7 +218,7 @@ class SafetyLimits:
         return self.rep_rate_hz_range
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DomainMapping:
     urlcc_dscp: Optional[int] = None
     embb_dscp: Optional[int] = None
@@ -165,7 +237,7 @@ class DomainMapping:
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BridgeConfig:
     qcs_endpoint: str
     plugin_endpoint: str
@@ -202,15 +274,35 @@ class BridgeRuntime:
         self._plugin: Optional[dcq_rpc.DualClockPluginStub] = None
         self._session_id: Optional[str] = None
         self._running = False
+        self._baseline_clock: Optional[dcq.ClockModel] = None
+        self._constraints: Optional[dcq.Constraints] = None
+        self._slo: Optional[dcq.Slo] = None
+        self._plan_req: Optional[dcq.PlanRequest] = None
+
+        # Guard rails are read on every cycle; keep them as validated plain
+        # floats so the hot path avoids the config attribute chain.
+        safety = config.safety
+        self._mu_lo, self._mu_hi = _check_bounds(safety.mu_bounds)
+        self._mu_decoy_lo = self._mu_lo / 10.0
+        self._rep_lo, self._rep_hi = _check_bounds(safety.rep_bounds)
+        phase_lim = float(safety.amzi_phase_deg_limit)
+        if not phase_lim >= 0.0:
+            raise ValueError(f"amzi_phase_deg_limit must be non-negative: {phase_lim}")
+        self._phase_lim = phase_lim
 
     # ------------------------------------------------------------------
     # Channel / session helpers
     # ------------------------------------------------------------------
     def _open_channel(self, endpoint: str) -> grpc.Channel:
+        # Channel-level compression applies to every call on the stubs.
         creds = self.config.tls.credentials()
         if creds is None:
-            return grpc.insecure_channel(endpoint)
-        return grpc.secure_channel(endpoint, creds)
+            return grpc.insecure_channel(
+                endpoint, options=_CHANNEL_OPTIONS, compression=grpc.Compression.Gzip
+            )
+        return grpc.secure_channel(
+            endpoint, creds, options=_CHANNEL_OPTIONS, compression=grpc.Compression.Gzip
+        )
 
     def connect(self) -> None:
         """Establish controller and plugin channels."""
@@ -222,9 +314,21 @@ class BridgeRuntime:
         self._plugin_channel = self._open_channel(self.config.plugin_endpoint)
         self._plugin = dcq_rpc.DualClockPluginStub(self._plugin_channel)
 
+        # These do not change for the lifetime of the connection; build them
+        # once rather than on every planning cycle.
+        self._baseline_clock = dcq.ClockModel(coarse_ppb=0.0, fine_hz=0.0, tdc_bin_ps=10.0, gate_ns=1.0)
+        self._constraints = self._plan_constraints()
+        self._slo = self._default_slo()
+
     def close(self) -> None:
-        for channel in filter(None, (self._qcs_channel, self._plugin_channel)):
-            channel.close()
+        if self._qcs_channel is not None:
+            self._qcs_channel.close()
+            self._qcs_channel = None
+            self._qcs = None
+        if self._plugin_channel is not None:
+            self._plugin_channel.close()
+            self._plugin_channel = None
+            self._plugin = None
 
     # ------------------------------------------------------------------
     # QCS helpers
@@ -255,7 +359,7 @@ class BridgeRuntime:
         return self._session_id
 
     def _initial_symbol_rate_mhz(self) -> float:
-        lo, hi = self.config.safety.rep_bounds
+        lo, hi = self._rep_lo, self._rep_hi
         if hi <= 0:
             return 100.0
         # pick midpoint of allowed range
@@ -265,32 +369,25 @@ class BridgeRuntime:
     # Plan helpers
     # ------------------------------------------------------------------
     def _status_to_telemetry(self, status: qcs.StatusResponse) -> dcq.Telemetry:
-        qber_pct = status.qber_pct if hasattr(status, "qber_pct") else 0.0
-        sifted_rate = status.sifted_rate_cps if hasattr(status, "sifted_rate_cps") else 0.0
-        secure_rate = status.secure_rate_cps if hasattr(status, "secure_rate_cps") else 0.0
-        jitter_ps = status.jitter_ps if hasattr(status, "jitter_ps") else 0.0
-        atm_loss = status.atm_loss_db_per_km if hasattr(status, "atm_loss_db_per_km") else 0.0
-        return dcq.Telemetry(
-            t_unix_ms=int(time.time() * 1000),
-            qber_pct=qber_pct,
-            sifted_rate_cps=sifted_rate,
-            secure_rate_bps=secure_rate,
-            jitter_ps=jitter_ps,
-            atm_loss_db_per_km=atm_loss,
-            dark_cps=getattr(status, "dark_counts_cps", 0.0),
-            det_eff=getattr(status, "det_efficiency", 0.0),
-            temperature_c=getattr(status, "temperature_c", 0.0),
-            site=getattr(status, "site", "unknown"),
+        telemetry = dcq.Telemetry(
+            t_unix_ms=time.time_ns() // 1_000_000,
+            qber_pct=status.qber_pct,
+            sifted_rate_cps=status.sifted_rate_cps,
+            secure_rate_bps=status.secure_rate_cps,
+            jitter_ps=status.jitter_ps,
+            atm_loss_db_per_km=status.atm_loss_db_per_km,
+            site=(status.site if _STATUS_HAS_SITE else "") or "unknown",
             active_domain=dcq.Domain.FSO,
-            scintillation_idx=getattr(status, "scintillation_idx", 0.0),
         )
+        for src, dst in _OPTIONAL_STATUS_FIELDS:
+            setattr(telemetry, dst, getattr(status, src))
+        return telemetry
 
     def _send_clock_model(self) -> None:
         if not self._plugin:
             raise RuntimeError("dcq plugin stub is not connected")
-        clock = dcq.ClockModel(coarse_ppb=0.0, fine_hz=0.0, tdc_bin_ps=10.0, gate_ns=1.0)
-        _LOG.debug("pushing baseline clock model: %s", clock)
-        self._plugin.SetClockModel(clock)
+        _LOG.debug("pushing baseline clock model: %s", self._baseline_clock)
+        self._plugin.SetClockModel(self._baseline_clock)
 
     def _plan_constraints(self) -> dcq.Constraints:
         safety = self.config.safety
@@ -309,76 +406,79 @@ class BridgeRuntime:
     # Apply helpers
     # ------------------------------------------------------------------
     def _clamp_decoys(self, decoys: dcq.DecoyProfile) -> dcq.DecoyProfile:
-        safety = self.config.safety
-        mu_sig = clamp(decoys.mu_signal or 0.0, safety.mu_bounds)
-        mu_dec = clamp(decoys.mu_decoy or 0.0, (safety.mu_bounds[0] / 10.0, safety.mu_bounds[1]))
-        vac_prob = clamp(decoys.vac_prob or 0.0, (0.0, 1.0))
-        sig_prob = clamp(decoys.sig_prob or 0.0, (0.0, 1.0))
-        decoy_prob = clamp(decoys.decoy_prob or 0.0, (0.0, 1.0))
+        # max/min rather than comparisons so a NaN override collapses onto a
+        # bound instead of slipping through.
+        mu_lo = self._mu_lo
+        mu_hi = self._mu_hi
         return dcq.DecoyProfile(
-            mu_signal=mu_sig,
-            mu_decoy=mu_dec,
-            vac_prob=vac_prob,
-            sig_prob=sig_prob,
-            decoy_prob=decoy_prob,
+            mu_signal=max(mu_lo, min(mu_hi, decoys.mu_signal)),
+            mu_decoy=max(self._mu_decoy_lo, min(mu_hi, decoys.mu_decoy)),
+            vac_prob=max(0.0, min(1.0, decoys.vac_prob)),
+            sig_prob=max(0.0, min(1.0, decoys.sig_prob)),
+            decoy_prob=max(0.0, min(1.0, decoys.decoy_prob)),
         )
 
     def _apply_plan(self, plan: dcq.PlanResponse) -> None:
         if not self._qcs or not self._session_id:
             raise RuntimeError("QCS session not established")
 
-        if plan.HasField("tx") and plan.tx.HasField("decoys"):
-            decoys = self._clamp_decoys(plan.tx.decoys)
-            _LOG.debug("applying decoy profile: %s", decoys)
-            self._qcs.SetDecoyProfile(
-                qcs.DecoyProfile(
-                    session_id=self._session_id,
-                    mu_signal=decoys.mu_signal,
-                    mu_decoy=decoys.mu_decoy,
-                    vacuum_prob=decoys.vac_prob,
-                )
-            )
-
-        if plan.HasField("tx") and plan.tx.rep_rate_hz:
-            rep_rate = clamp(plan.tx.rep_rate_hz, self.config.safety.rep_bounds)
-            symbol_rate_mhz = rep_rate / 1e6
-            _LOG.debug("nudging symbol rate to %.3f MHz", symbol_rate_mhz)
-            self._qcs.Configure(
-                qcs.ConfigureRequest(
-                    mode="BB84_TIME_BIN",
-                    wavelength_nm=1550.0,
-                    symbol_rate_MHz=symbol_rate_mhz,
-                    divergence_urad=100.0,
-                    use_spad=False,
-                    ptp_enable=True,
-                )
-            )
-
-        if plan.HasField("phase") and abs(plan.phase.amzi_phase_deg) > 0.1:
-            phase_delta = clamp(
-                plan.phase.amzi_phase_deg,
-                (-self.config.safety.amzi_phase_deg_limit, self.config.safety.amzi_phase_deg_limit),
-            )
-            _LOG.debug("requesting MZI phase calibration %.2f deg", phase_delta)
-            self._qcs.Calibrate(
-                qcs.CalibrationRequest(type="MZI_PHASE")
-            )
+        # Every override for this cycle travels in one ApplyPlan call; the
+        # controller dispatches decoy, symbol rate, calibration and domain
+        # updates.  The full Configure request is only sent by ensure_session.
+        request = qcs.PlanApplyRequest(session_id=self._session_id)
+
+        # Bind each sub-message once; every HasField/attribute access crosses
+        # into the protobuf runtime.
+        if plan.HasField("tx"):
+            tx = plan.tx
+            if tx.HasField("decoys"):
+                decoys = self._clamp_decoys(tx.decoys)
+                _LOG.debug("applying decoy profile: %s", decoys)
+                req_decoys = request.decoys
+                req_decoys.session_id = self._session_id
+                req_decoys.mu_signal = decoys.mu_signal
+                req_decoys.mu_decoy = decoys.mu_decoy
+                req_decoys.vacuum_prob = decoys.vac_prob
+
+            rep_rate = tx.rep_rate_hz
+            if rep_rate:
+                rep_rate = max(self._rep_lo, min(self._rep_hi, rep_rate))
+                symbol_rate_mhz = rep_rate / 1e6
+                _LOG.debug("nudging symbol rate to %.3f MHz", symbol_rate_mhz)
+                request.symbol_rate.session_id = self._session_id
+                request.symbol_rate.mhz = symbol_rate_mhz
+
+        if plan.HasField("phase"):
+            amzi_phase_deg = plan.phase.amzi_phase_deg
+            if abs(amzi_phase_deg) > 0.1:
+                phase_lim = self._phase_lim
+                phase_delta = max(-phase_lim, min(phase_lim, amzi_phase_deg))
+                _LOG.debug("requesting MZI phase calibration %.2f deg", phase_delta)
+                request.calibrate.type = "MZI_PHASE"
 
         if plan.HasField("domain"):
-            self._publish_domain_policy(plan.domain)
+            domain = plan.domain
+            self._publish_domain_policy(domain)
+            req_domain = request.domain
+            # Unknown or DOMAIN_UNKNOWN preferences leave the field empty.
+            req_domain.preferred = _DOMAIN_NAMES.get(domain.preferred, "")
+            req_domain.srv6_bsid = domain.srv6_bsid
+            req_domain.dscp = domain.dscp
+            req_domain.mlo_prefer_6ghz = domain.mlo_prefer_6ghz
+
+        # session_id is always populated; skip the call when nothing else is.
+        if len(request.ListFields()) > 1:
+            self._qcs.ApplyPlan(request)
 
     def _publish_domain_policy(self, domain: dcq.DomainPolicy) -> None:
+        # Purely diagnostic; skip the field reads when debug output is off.
+        if not _LOG.isEnabledFor(logging.DEBUG):
+            return
+
         mapping = self.config.mapping
-        if domain.preferred == dcq.Domain.FSO:
-            _LOG.debug("domain preference: FSO")
-        elif domain.preferred == dcq.Domain.MMWAVE:
-            _LOG.debug("domain preference: mmWave")
-        elif domain.preferred == dcq.Domain.LEO:
-            _LOG.debug("domain preference: LEO")
-        elif domain.preferred == dcq.Domain.WIFI7:
-            _LOG.debug("domain preference: Wi-Fi 7")
-        elif domain.preferred == dcq.Domain.FR3_6G:
-            _LOG.debug("domain preference: FR3/6G")
+        label = _DOMAIN_LABELS.get(domain.preferred)
+        if label:
+            _LOG.debug("domain preference: %s", label)
 
         if domain.dscp:
             _LOG.debug("set DSCP %s", domain.dscp)
@@ -402,8 +502,15 @@ class BridgeRuntime:
         caps = self._plugin.Describe(dcq.Empty())
         _LOG.info("plugin capabilities: %s", caps)
 
-        constraints = self._plan_constraints()
-        slo = self._default_slo()
+        # Only the telemetry changes between cycles.  Reusing the request is
+        # safe because it has been serialized by the time the plugin's reply
+        # to it arrives.
+        self._plan_req = dcq.PlanRequest(
+            clock=self._baseline_clock,
+            limits=self._constraints,
+            slo=self._slo,
+            include_rationale=_LOG.isEnabledFor(logging.DEBUG),
+        )
 
         _LOG.info(
             "starting control loop (cycle=%d ms, qber ceiling=%.2f%%)",
@@ -411,9 +518,29 @@ class BridgeRuntime:
             self.config.safety.qber_hard_ceiling_pct,
         )
 
-        try:
+        # The controller pushes status frames at its own cadence and each plan
+        # is a frame exchange on one long-lived bidirectional stream, so the
+        # loop never sets up a new RPC per cycle.
+        plan_requests: "queue.Queue[Optional[dcq.PlanRequest]]" = queue.Queue()
+
+        def plan_request_gen() -> Iterator[dcq.PlanRequest]:
             while True:
-                status = self._qcs.GetStatus(qcs.StatusRequest())
+                request = plan_requests.get()
+                if request is None:
+                    return
+                yield request
+
+        status_iter = self._qcs.StatusStream(qcs.StatusRequest())
+        plan_iter = self._plugin.PlanStream(plan_request_gen())
+
+        # Every status frame is checked against the QBER ceiling, but plans
+        # are only requested on a fixed monotonic grid of cycle_period_ms so
+        # the planning cadence neither follows the telemetry rate nor drifts.
+        cycle_s = self.config.cycle_period_ms / 1000.0
+        next_plan = time.monotonic()
+
+        try:
+            for status in status_iter:
                 telemetry = self._status_to_telemetry(status)
                 _LOG.debug("telemetry snapshot: %s", telemetry)
 
@@ -427,7 +554,6 @@ class BridgeRuntime:
                         self._qcs.Shutter(qcs.ShutterRequest(open=False))
                         self._qcs.StopQkd(qcs.StopRequest(session_id=self._session_id))
                         self._running = False
-                    time.sleep(self.config.cycle_period_ms / 1000.0)
                     continue
 
                 if not self._running:
@@ -436,21 +562,29 @@ class BridgeRuntime:
                     self._qcs.StartQkd(qcs.StartRequest(session_id=self._session_id))
                     self._running = True
 
-                plan = self._plugin.PlanCycle(
-                    dcq.PlanRequest(
-                        clock=dcq.ClockModel(coarse_ppb=0.0, fine_hz=0.0, tdc_bin_ps=10.0, gate_ns=1.0),
-                        tel=telemetry,
-                        limits=constraints,
-                        slo=slo,
-                    )
-                )
+                now = time.monotonic()
+                if now < next_plan:
+                    continue
+                next_plan += cycle_s
+                if next_plan <= now:
+                    # A stalled stream missed whole cycles; re-anchor.
+                    next_plan = now + cycle_s
+
+                self._plan_req.tel.CopyFrom(telemetry)
+                plan_requests.put(self._plan_req)
+                plan = next(plan_iter, None)
+                if plan is None:
+                    raise RuntimeError("dcq plugin closed the plan stream")
                 _LOG.debug("received plan: %s", plan)
                 self._apply_plan(plan)
 
-                time.sleep(self.config.cycle_period_ms / 1000.0)
+            _LOG.info("QCS status stream ended, stopping")
         except KeyboardInterrupt:
             _LOG.info("bridge interrupted, stopping")
         finally:
+            plan_requests.put(None)
+            plan_iter.cancel()
+            status_iter.cancel()
             if self._running and self._session_id:
                 self._qcs.StopQkd(qcs.StopRequest(session_id=self._session_id))
             if self.config.safety.shutter_guard:
@@ -464,7 +598,7 @@ class BridgeRuntime:
 def load_config(path: Path) -> BridgeConfig:
     """Parse a YAML bridge configuration into a :class:`BridgeConfig`."""
 
-    data = yaml.safe_load(path.read_text())
+    data = yaml.load(path.read_bytes(), Loader=_YamlLoader)
     return BridgeConfig.from_dict(data)
 
 
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import os
 from pathlib import Path
 from typing import Iterable, Optional
 
@@ -9,14 +11,22 @@ _MODULE_DIR = Path(__file__).resolve().parent
 _PROJECT_ROOT = _MODULE_DIR.parent
 _REPO_ROOT = _PROJECT_ROOT.parent
 _DEFAULT_CONFIG = Path("configs/lab_snsdp.yaml")
+_RUN_BRIDGE = None
 
 
 def _resolve_config(path: Path) -> Path:
     """Resolve *path* against common repository roots."""
 
-    candidates = [path] if path.is_absolute() else [Path.cwd() / path,
-                                                   _PROJECT_ROOT / path,
-                                                   _REPO_ROOT / path]
+    # Relative paths also depend on the working directory, so it is part of
+    # the cache key; absolute paths ignore it.
+    cwd = "" if path.is_absolute() else os.getcwd()
+    return _resolve_config_cached(str(path), cwd)
+
+
+@functools.lru_cache(maxsize=16)
+def _resolve_config_cached(path_str: str, cwd: str) -> Path:
+    path = Path(path_str)
+    candidates = (path,) if not cwd else (Path(cwd) / path, _PROJECT_ROOT / path, _REPO_ROOT / path)
     for candidate in candidates:
         if candidate.exists():
             return candidate
@@ -57,11 +67,14 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
 def _import_run_bridge():
     """Import ``run_bridge`` while surfacing clearer dependency errors."""
 
-    # Import lazily so ``qcsd --help`` works even if optional dependencies are
-    # not installed yet.
-    from bridge.qcs_dcq_bridge import run_bridge
+    global _RUN_BRIDGE
+    if _RUN_BRIDGE is None:
+        # Import lazily so ``qcsd --help`` works even if optional dependencies
+        # are not installed yet; later calls reuse the resolved function.
+        from bridge.qcs_dcq_bridge import run_bridge
 
-    return run_bridge
+        _RUN_BRIDGE = run_bridge
+    return _RUN_BRIDGE
 
 
 def _format_missing_dependency(error: ModuleNotFoundError) -> str:
@@ -88,5 +101,13 @@ def _format_missing_dependency(error: ModuleNotFoundError) -> str:
     return f"Missing dependency '{missing}'. {hint}"
 
 
+if os.environ.get("QCSD_PRELOAD") == "1":  # pragma: no cover - opt-in warm start
+    try:
+        _import_run_bridge()
+    except ModuleNotFoundError:
+        # main() reports the missing dependency with a remediation hint.
+        pass
+
+
 if __name__ == "__main__":  # pragma: no cover - CLI entry
     raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""Shared fixtures for the bridge tests.
+
+The generated protobuf stubs are not checked in, so compile the dcq.v1
+contract and the qchs.v1 control API published in ``docs/qchs_spec.md``
+into a session temp directory whenever ``grpcio-tools`` is available.
+Tests that need the stubs still ``importorskip`` them.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+_STUB_DIR = tempfile.TemporaryDirectory(prefix="qchs-stubs-")
+
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+
+def _generate_stubs(out_dir: Path) -> None:
+    try:
+        from grpc_tools import protoc
+    except ModuleNotFoundError:
+        return
+
+    spec = (_PROJECT_ROOT / "docs" / "qchs_spec.md").read_text(encoding="utf-8")
+    match = re.search(r"## Control Proto API \(v1\)\s*```protobuf\n(.*?)```", spec, re.S)
+    if match is None:
+        return
+    (out_dir / "qcs_control.proto").write_text(match.group(1), encoding="utf-8")
+
+    status = protoc.main(
+        [
+            "grpc_tools.protoc",
+            f"--proto_path={_PROJECT_ROOT / 'proto'}",
+            f"--proto_path={out_dir}",
+            f"--python_out={out_dir}",
+            f"--grpc_python_out={out_dir}",
+            str(_PROJECT_ROOT / "proto" / "dcq_plugin.proto"),
+            str(out_dir / "qcs_control.proto"),
+        ]
+    )
+    if status == 0:
+        # Stubs already on PYTHONPATH take precedence.
+        sys.path.append(str(out_dir))
+
+
+_generate_stubs(Path(_STUB_DIR.name))
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    _STUB_DIR.cleanup()
+
+
+@pytest.fixture
+def fast_keepalive(monkeypatch: pytest.MonkeyPatch):
+    """Shorten the bridge keepalive so idle-stream ping policy shows up in seconds."""
+
+    from bridge import qcs_dcq_bridge
+
+    options = dict(qcs_dcq_bridge._CHANNEL_OPTIONS)
+    options["grpc.keepalive_time_ms"] = 100
+    options["grpc.keepalive_timeout_ms"] = 1000
+    options["grpc.http2.min_time_between_pings_ms"] = 100
+    monkeypatch.setattr(qcs_dcq_bridge, "_CHANNEL_OPTIONS", tuple(options.items()))
+    return qcs_dcq_bridge._CHANNEL_OPTIONS
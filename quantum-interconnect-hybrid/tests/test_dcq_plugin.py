@@ -0,0 +1,44 @@
+import queue
+import time
+from concurrent import futures
+
+import pytest
+
+grpc = pytest.importorskip("grpc")
+pytest.importorskip("yaml")
+pytest.importorskip("dcq_plugin_pb2")
+
+import dcq_plugin_pb2 as dcq  # noqa: E402
+import dcq_plugin_pb2_grpc as dcq_rpc  # noqa: E402
+
+from bridge import dcq_plugin  # noqa: E402
+
+
+@pytest.fixture
+def plugin_server():
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4), options=dcq_plugin._SERVER_OPTIONS)
+    dcq_rpc.add_DualClockPluginServicer_to_server(dcq_plugin.Plugin(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    yield f"127.0.0.1:{port}"
+    server.stop(None)
+
+
+def test_plan_stream_survives_idle_keepalive(plugin_server, fast_keepalive):
+    # The bridge stops sending PlanRequests while halted on the QBER ceiling;
+    # idle well past the ping-strike budget of a default gRPC server.
+    channel = grpc.insecure_channel(plugin_server, options=fast_keepalive)
+    requests = queue.Queue()
+    responses = dcq_rpc.DualClockPluginStub(channel).PlanStream(iter(requests.get, None))
+    try:
+        requests.put(dcq.PlanRequest(tel=dcq.Telemetry(qber_pct=1.0)))
+        assert next(responses).tx.rep_rate_hz == pytest.approx(1e8)
+
+        time.sleep(10)
+
+        requests.put(dcq.PlanRequest(tel=dcq.Telemetry(qber_pct=1.0)))
+        assert next(responses).tx.rep_rate_hz == pytest.approx(1e8)
+    finally:
+        requests.put(None)
+        responses.cancel()
+        channel.close()
@@ -0,0 +1,247 @@
+import time
+from concurrent import futures
+
+import pytest
+
+grpc = pytest.importorskip("grpc")
+pytest.importorskip("yaml")
+pytest.importorskip("qcs_control_pb2")
+pytest.importorskip("dcq_plugin_pb2")
+
+import dcq_plugin_pb2 as dcq  # noqa: E402
+import dcq_plugin_pb2_grpc as dcq_rpc  # noqa: E402
+import qcs_control_pb2 as qcs  # noqa: E402
+import qcs_control_pb2_grpc as qcs_rpc  # noqa: E402
+
+from bridge.dcq_plugin import _SERVER_OPTIONS  # noqa: E402
+from bridge.qcs_dcq_bridge import BridgeConfig, BridgeRuntime  # noqa: E402
+
+
+class _RecordingQcs:
+    def __init__(self):
+        self.applied = []
+
+    def ApplyPlan(self, request):
+        self.applied.append(request)
+
+
+def _config(phase_limit=10, **bridge):
+    return BridgeConfig.from_dict(
+        {
+            "bridge": {
+                "qcs_endpoint": "127.0.0.1:7443",
+                "plugin_endpoint": "127.0.0.1:7700",
+                **bridge,
+                "safety": {
+                    "mu_range": [0.05, 0.8],
+                    "rep_rate_hz_range": [5.0e6, 2.5e8],
+                    "amzi_phase_deg_limit": phase_limit,
+                    "qber_hard_ceiling_pct": 11.0,
+                },
+            }
+        }
+    )
+
+
+def _runtime():
+    runtime = BridgeRuntime(_config())
+    runtime._qcs = _RecordingQcs()
+    runtime._session_id = "s1"
+    return runtime
+
+
+def _plan(preferred):
+    return dcq.PlanResponse(domain=dcq.DomainPolicy(preferred=preferred, srv6_bsid="FC00::A", dscp=46))
+
+
+def test_apply_plan_forwards_known_domain():
+    runtime = _runtime()
+    runtime._apply_plan(_plan(dcq.Domain.MMWAVE))
+    (request,) = runtime._qcs.applied
+    assert request.domain.preferred == "MMWAVE"
+    assert request.domain.dscp == 46
+
+
+@pytest.mark.parametrize("preferred", [dcq.Domain.DOMAIN_UNKNOWN, 9])
+def test_apply_plan_leaves_unknown_domain_empty(preferred):
+    runtime = _runtime()
+    runtime._apply_plan(_plan(preferred))
+    (request,) = runtime._qcs.applied
+    assert request.domain.preferred == ""
+    assert request.domain.srv6_bsid == "FC00::A"
+
+
+@pytest.mark.parametrize("phase_limit", [-1.0, float("nan")])
+def test_runtime_rejects_invalid_phase_limit(phase_limit):
+    with pytest.raises(ValueError, match="amzi_phase_deg_limit"):
+        BridgeRuntime(_config(phase_limit))
+
+
+class _FakeQcs(qcs_rpc.QchsControlServicer):
+    """Controller that plays back ``(delay_s, qber_pct)`` status frames."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def Configure(self, request, context):
+        return qcs.ConfigureResponse(session_id="s1")
+
+    def StartQkd(self, request, context):
+        self.calls.append("StartQkd")
+        return qcs.StartResponse(started=True)
+
+    def StopQkd(self, request, context):
+        self.calls.append("StopQkd")
+        return qcs.StopResponse(stopped=True)
+
+    def Shutter(self, request, context):
+        self.calls.append(f"Shutter(open={request.open})")
+        return qcs.Ack(ok=True)
+
+    def ApplyPlan(self, request, context):
+        self.calls.append("ApplyPlan")
+        return qcs.Ack(ok=True)
+
+    def StatusStream(self, request, context):
+        for delay, qber in self.frames:
+            time.sleep(delay)
+            yield qcs.StatusResponse(lock_state="LOCKED", qber_pct=qber)
+
+
+class _FakePlugin(dcq_rpc.DualClockPluginServicer):
+    """Plugin that answers every plan request, closing after ``max_plans``."""
+
+    def __init__(self, max_plans=None):
+        self.max_plans = max_plans
+        self.plans = 0
+
+    def Hello(self, request, context):
+        return dcq.HelloResp(bridge_version="test")
+
+    def Describe(self, request, context):
+        return dcq.Capabilities(can_plan_tx_schedule=True)
+
+    def SetClockModel(self, request, context):
+        return dcq.Ack(ok=True)
+
+    def PlanStream(self, request_iterator, context):
+        for _ in request_iterator:
+            if self.max_plans is not None and self.plans >= self.max_plans:
+                return
+            self.plans += 1
+            yield dcq.PlanResponse(tx=dcq.TxOverrides(rep_rate_hz=1e8))
+
+
+class _CallSpy:
+    """Delegates to a streaming call and records whether it was cancelled."""
+
+    def __init__(self, call):
+        self._call = call
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._call)
+
+    def cancel(self):
+        self.cancelled = True
+        return self._call.cancel()
+
+
+class _Harness:
+    def __init__(self):
+        self.servers = []
+        self.spies = {}
+
+    def _serve(self, add, servicer):
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=4), options=_SERVER_OPTIONS)
+        add(servicer, server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        self.servers.append(server)
+        return f"127.0.0.1:{port}"
+
+    def _spy(self, stub, name):
+        method = getattr(stub, name)
+
+        def call(*args, **kwargs):
+            spy = self.spies[name] = _CallSpy(method(*args, **kwargs))
+            return spy
+
+        setattr(stub, name, call)
+
+    def run(self, controller, plugin, cycle_period_ms=0):
+        runtime = BridgeRuntime(
+            _config(
+                qcs_endpoint=self._serve(qcs_rpc.add_QchsControlServicer_to_server, controller),
+                plugin_endpoint=self._serve(dcq_rpc.add_DualClockPluginServicer_to_server, plugin),
+                cycle_period_ms=cycle_period_ms,
+            )
+        )
+        runtime.connect()
+        self._spy(runtime._qcs, "StatusStream")
+        self._spy(runtime._plugin, "PlanStream")
+        runtime.run()
+
+    def assert_streams_cancelled(self):
+        assert self.spies["StatusStream"].cancelled
+        assert self.spies["PlanStream"].cancelled
+
+
+@pytest.fixture
+def harness():
+    harness = _Harness()
+    yield harness
+    for server in harness.servers:
+        server.stop(None)
+
+
+def test_run_plans_once_per_cycle(harness):
+    controller = _FakeQcs([(0.01, 1.0)] * 30)
+    plugin = _FakePlugin()
+
+    started = time.monotonic()
+    harness.run(controller, plugin, cycle_period_ms=200)
+    elapsed = time.monotonic() - started
+
+    assert 2 <= plugin.plans <= elapsed / 0.2 + 1
+    assert controller.calls.count("ApplyPlan") == plugin.plans
+    harness.assert_streams_cancelled()
+    assert controller.calls[-2:] == ["StopQkd", "Shutter(open=False)"]
+
+
+def test_run_recovers_from_qber_halt(harness, fast_keepalive):
+    # PlanStream carries nothing while halted; with the shortened keepalive a
+    # server that rejected the bridge's pings would drop it well within 10 s.
+    controller = _FakeQcs([(0.0, 1.0)] + [(1.0, 20.0)] * 10 + [(0.0, 1.0)])
+    plugin = _FakePlugin()
+
+    harness.run(controller, plugin)
+
+    assert plugin.plans == 2
+    assert controller.calls == [
+        "StartQkd",
+        "ApplyPlan",
+        "Shutter(open=False)",
+        "StopQkd",
+        "Shutter(open=True)",
+        "StartQkd",
+        "ApplyPlan",
+        "StopQkd",
+        "Shutter(open=False)",
+    ]
+    harness.assert_streams_cancelled()
+
+
+def test_run_fails_when_plugin_closes_plan_stream(harness):
+    controller = _FakeQcs([(0.01, 1.0)] * 5)
+    plugin = _FakePlugin(max_plans=1)
+
+    with pytest.raises(RuntimeError, match="dcq plugin closed the plan stream"):
+        harness.run(controller, plugin)
+
+    assert controller.calls == ["StartQkd", "ApplyPlan", "StopQkd", "Shutter(open=False)"]
+    harness.assert_streams_cancelled()